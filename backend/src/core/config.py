@@ -10,6 +10,29 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Trivia Game API"
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./trivia_scores.db")
     WEBSOCKET_PREFIX: str = os.getenv("WEBSOCKET_PREFIX", "/ws")
+
+    # Journal de recuperação das salas (vazio = desativado)
+    JOURNAL_DIR: str = os.getenv("JOURNAL_DIR", "")
+    JOURNAL_FSYNC_INTERVAL_MS: int = int(os.getenv("JOURNAL_FSYNC_INTERVAL_MS", "50"))
+    JOURNAL_SNAPSHOT_INTERVAL_S: int = int(os.getenv("JOURNAL_SNAPSHOT_INTERVAL_S", "60"))
+    JOURNAL_RECONNECT_TIMEOUT_S: int = int(os.getenv("JOURNAL_RECONNECT_TIMEOUT_S", "120"))
+
+    # Espectadores: intervalo entre frames e timeout de envio por socket
+    SPECTATOR_TICK_MS: int = int(os.getenv("SPECTATOR_TICK_MS", "250"))
+    SPECTATOR_SEND_TIMEOUT_S: float = float(os.getenv("SPECTATOR_SEND_TIMEOUT_S", "2.0"))
+
+    # Estatísticas por pergunta: intervalo entre os flushes para o banco
+    ANALYTICS_FLUSH_INTERVAL_S: int = int(os.getenv("ANALYTICS_FLUSH_INTERVAL_S", "30"))
+
+    # Heartbeat: intervalo entre pings, tempo sem resposta até desconectar e granularidade da varredura
+    HEARTBEAT_INTERVAL_S: int = int(os.getenv("HEARTBEAT_INTERVAL_S", "15"))
+    HEARTBEAT_TIMEOUT_S: int = int(os.getenv("HEARTBEAT_TIMEOUT_S", "45"))
+    HEARTBEAT_TICK_MS: int = int(os.getenv("HEARTBEAT_TICK_MS", "500"))
+
+    # Torneios: intervalo mínimo entre envios do ranking e maior top N permitido
+    LEADERBOARD_PUSH_INTERVAL_MS: int = int(os.getenv("LEADERBOARD_PUSH_INTERVAL_MS", "1000"))
+    LEADERBOARD_MAX_TOP_N: int = int(os.getenv("LEADERBOARD_MAX_TOP_N", "50"))
+    TOURNAMENT_MAX_DURATION_S: int = int(os.getenv("TOURNAMENT_MAX_DURATION_S", "21600"))
     
     # CORS
     BACKEND_CORS_ORIGINS_STR: str = os.getenv("CORS_ORIGINS", '["http://localhost:3000","http://127.0.0.1:3000"]')
@@ -0,0 +1,29 @@
+import json
+from sqlmodel import Session, select
+from app.models.question_stats import QuestionStats
+from typing import Dict, List, Any
+
+def get_question_stats(db: Session) -> List[QuestionStats]:
+    """Recupera as estatísticas agregadas de todas as perguntas."""
+    return db.exec(select(QuestionStats)).all()
+
+def add_question_stats_deltas(db: Session, *, deltas: Dict[int, Dict[str, Any]]) -> None:
+    """Soma, em uma única transação, os contadores acumulados de várias perguntas à tabela agregada."""
+    if not deltas:
+        return
+    statement = select(QuestionStats).where(QuestionStats.question_id.in_(list(deltas)))
+    existing = {row.question_id: row for row in db.exec(statement).all()}
+    for question_id, delta in deltas.items():
+        row = existing.get(question_id) or QuestionStats(question_id=question_id)
+        row.times_answered += delta["times_answered"]
+        row.times_correct += delta["times_correct"]
+        row.times_timed += delta["times_timed"]
+        row.total_response_ms += delta["total_response_ms"]
+        option_counts = json.loads(row.option_counts)
+        if len(option_counts) < len(delta["option_counts"]):
+            option_counts.extend([0] * (len(delta["option_counts"]) - len(option_counts)))
+        for i, count in enumerate(delta["option_counts"]):
+            option_counts[i] += count
+        row.option_counts = json.dumps(option_counts)
+        db.add(row)
+    db.commit()
@@ -2,16 +2,45 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
+import signal
 
 from app.database.setup import create_db_and_tables, engine
-from app.routers import websockets as ws_router, ranking as ranking_router
+from app.routers import websockets as ws_router, ranking as ranking_router, tournaments as tournaments_router
 from app.core.config import settings
 from app.services.game_manager import game_manager # Para carregar perguntas no startup
+from app.services.room_journal import room_journal
+from app.services.spectator_broadcaster import spectator_broadcaster
+from app.services.answer_analytics import answer_analytics
+from app.services.heartbeat import heartbeat_monitor
+from app.services.tournament_manager import tournament_manager
 
 # Configuração básica de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _install_shutdown_hook():
+    """
+    Encadeia um handler aos sinais de encerramento já instalados pelo servidor
+    (uvicorn). O uvicorn fecha todos os WebSockets antes do shutdown do lifespan;
+    marcar o encerramento no sinal evita que essas desconexões apaguem as salas
+    do journal.
+    """
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            game_manager.begin_shutdown()
+            previous(signum, frame)
+
+        try:
+            signal.signal(sig, handler)
+        except ValueError:
+            # Fora da thread principal (ex.: testes); sem hook de sinal
+            logger.warning("Não foi possível instalar o hook de encerramento para sinais.")
+            return
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Aplicação iniciando...")
@@ -24,8 +53,35 @@ async def lifespan(app: FastAPI):
             logger.info(f"{len(game_manager.questions_pool)} perguntas carregadas para o GameManager.")
         else:
             logger.warning("Nenhuma pergunta carregada para o GameManager na inicialização.")
+    # Estatísticas por pergunta: layout das colunas e pesos a partir dos agregados salvos
+    answer_analytics.configure(game_manager.questions_pool or [])
+    answer_analytics.load_aggregates()
+    answer_analytics.start()
+    # Recupera as salas em andamento a partir do journal (se ativo)
+    if room_journal.enabled:
+        recovered_rooms, replayed_events = room_journal.recover()
+        restored = game_manager.restore_rooms(recovered_rooms, settings.JOURNAL_RECONNECT_TIMEOUT_S)
+        logger.info(f"{restored} salas recuperadas do journal ({replayed_events} eventos reaplicados).")
+        room_journal.start()
+        _install_shutdown_hook()
+    spectator_broadcaster.start()
+    heartbeat_monitor.start()
+    tournament_manager.start()
     yield
     logger.info("Aplicação encerrando...")
+    game_manager.begin_shutdown()
+    # Cada serviço é encerrado isoladamente: uma falha não impede o snapshot final do journal
+    for name, stop in (
+        ("torneios", tournament_manager.stop),
+        ("heartbeat", heartbeat_monitor.stop),
+        ("espectadores", spectator_broadcaster.stop),
+        ("estatísticas", answer_analytics.stop),
+        ("journal", room_journal.stop),
+    ):
+        try:
+            await stop()
+        except Exception as e:
+            logger.error(f"Erro ao encerrar o serviço de {name}: {e}", exc_info=True)
     if hasattr(engine, 'dispose'): # Para SQLAlchemy engine
         engine.dispose()
 
@@ -57,6 +113,7 @@ else:
 # Incluir roteadores
 app.include_router(ws_router.router, prefix=settings.WEBSOCKET_PREFIX) # Adiciona prefixo global para WebSockets
 app.include_router(ranking_router.router, prefix="/api/v1") # Adiciona prefixo para API REST
+app.include_router(tournaments_router.router, prefix="/api/v1")
 
 @app.get("/api/v1/health")
 async def root():
@@ -0,0 +1,9 @@
+from sqlmodel import SQLModel, Field
+
+class QuestionStats(SQLModel, table=True):
+    question_id: int = Field(primary_key=True)
+    times_answered: int = Field(default=0)
+    times_correct: int = Field(default=0)
+    times_timed: int = Field(default=0) # Respostas com tempo de resposta conhecido
+    total_response_ms: int = Field(default=0)
+    option_counts: str = Field(default="[]") # Lista JSON: quantidade de escolhas por índice de opção
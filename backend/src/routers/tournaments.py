@@ -0,0 +1,58 @@
+from fastapi import APIRouter, HTTPException
+from typing import List
+
+from app.schemas.tournament import TournamentCreate, TournamentRead, LeaderboardEntry
+from app.services.game_manager import game_manager
+from app.services.tournament_manager import tournament_manager, Tournament
+
+router = APIRouter(
+    prefix="/tournaments",
+    tags=["tournaments"],
+)
+
+def _to_read(tournament: Tournament) -> TournamentRead:
+    return TournamentRead(
+        tournament_id=tournament.tournament_id,
+        name=tournament.name,
+        room_ids=sorted(tournament.room_ids),
+        total_questions=len(tournament.questions),
+        total_players=len(tournament.leaderboard),
+    )
+
+@router.post("/", response_model=TournamentRead)
+def create_tournament(tournament_in: TournamentCreate):
+    """
+    Cria um torneio. As salas entram nele com
+    {"type": "create_room", "payload": {"tournament_id": "..."}}.
+    """
+    tournament = game_manager.create_tournament(tournament_in.name)
+    if not tournament:
+        raise HTTPException(status_code=503, detail="Falha ao carregar perguntas para o torneio.")
+    return _to_read(tournament)
+
+@router.get("/{tournament_id}", response_model=TournamentRead)
+def read_tournament(tournament_id: str):
+    tournament = tournament_manager.get_tournament(tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Torneio não encontrado.")
+    return _to_read(tournament)
+
+@router.get("/{tournament_id}/leaderboard", response_model=List[LeaderboardEntry])
+def read_tournament_leaderboard(tournament_id: str, limit: int = 10):
+    """
+    Retorna o top N do ranking combinado das salas do torneio.
+    """
+    tournament = tournament_manager.get_tournament(tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Torneio não encontrado.")
+    return tournament.leaderboard.top(max(1, min(limit, tournament_manager.max_top_n)))
+
+@router.delete("/{tournament_id}", response_model=TournamentRead)
+async def end_tournament(tournament_id: str):
+    """
+    Encerra o torneio: os inscritos recebem o ranking final e o torneio deixa de aceitar salas.
+    """
+    tournament = await tournament_manager.end_tournament(tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Torneio não encontrado.")
+    return _to_read(tournament)
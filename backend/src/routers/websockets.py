@@ -1,11 +1,99 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
 from app.services.connection_manager import manager as conn_manager
 from app.services.game_manager import game_manager
+from app.services.heartbeat import heartbeat_monitor
+from app.services.tournament_manager import tournament_manager
+from app.schemas.messages import (
+    InboundMessage, CreateRoomMessage, JoinRoomMessage, SpectateRoomMessage, SubscribeLeaderboardMessage,
+    parse_inbound_message
+)
+from pydantic import ValidationError
+from typing import Awaitable, Callable, Dict, Union
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+
+async def _cleanup_connection(websocket: WebSocket, room_id: str, user_name: str, is_spectator: bool):
+    """Remove a conexão da sala, a menos que o heartbeat já tenha feito isso."""
+    heartbeat_monitor.unregister(websocket)
+    tournament_manager.unsubscribe(websocket)
+    if is_spectator:
+        conn_manager.remove_spectator(websocket, room_id)
+    elif websocket in conn_manager.websocket_users:
+        conn_manager.disconnect(websocket, room_id) # Remove do ConnectionManager
+        await game_manager.process_disconnect(room_id, user_name, websocket) # Notifica GameManager
+
+class ConnectionSession:
+    """Estado de uma conexão WebSocket: sala associada e papel (jogador ou espectador)."""
+    def __init__(self, user_name: str):
+        self.user_name = user_name
+        self.room_id: str | None = None
+        self.is_spectator = False
+
+# Handlers retornam False quando a conexão deve ser encerrada.
+SessionHandler = Callable[[ConnectionSession, InboundMessage, WebSocket], Awaitable[bool]]
+
+async def _handle_create_room(session: ConnectionSession, message: CreateRoomMessage, websocket: WebSocket) -> bool:
+    room_id_created = await game_manager.handle_create_room(session.user_name, websocket, message.payload.tournament_id)
+    if not room_id_created:
+        # Erro ao criar sala, fechar conexão ou enviar erro específico
+        await conn_manager.send_personal_message({"type": "create_room_error", "message": "Falha ao criar sala."}, websocket)
+        return False
+    # Mensagem de sucesso já é enviada por handle_create_room (via handle_player_join)
+    session.room_id = room_id_created
+    heartbeat_monitor.register(websocket, session.room_id, session.user_name)
+    return True
+
+async def _handle_join_room(session: ConnectionSession, message: JoinRoomMessage, websocket: WebSocket) -> bool:
+    room_id_to_join = message.payload.room_id
+    # Conecta ao ConnectionManager ANTES de chamar handle_player_join
+    # para que o websocket já esteja no pool do conn_manager para broadcasts.
+    await conn_manager.connect(websocket, room_id_to_join, session.user_name)
+    # Se o join for bem-sucedido, o handle_player_join envia 'join_room_success';
+    # se falhar (sala não existe, jogo em progresso), envia 'join_room_error'.
+    await game_manager.handle_player_join(room_id_to_join, session.user_name, websocket)
+
+    # Verificando se a sala existe no game_manager para definir a sala da sessão
+    if room_id_to_join in game_manager.rooms_data and session.user_name in game_manager.rooms_data[room_id_to_join].players:
+        session.room_id = room_id_to_join
+        heartbeat_monitor.register(websocket, session.room_id, session.user_name)
+        return True
+    # O join falhou (provavelmente handle_player_join enviou erro)
+    logger.warning(f"Tentativa de join de '{session.user_name}' à sala '{room_id_to_join}' falhou ou estado inconsistente.")
+    conn_manager.disconnect(websocket, room_id_to_join) # Garante desconexão
+    return False
+
+async def _handle_spectate_room(session: ConnectionSession, message: SpectateRoomMessage, websocket: WebSocket) -> bool:
+    if await game_manager.handle_spectator_join(message.payload.room_id, websocket):
+        session.room_id = message.payload.room_id
+        session.is_spectator = True
+        heartbeat_monitor.register(websocket, session.room_id, session.user_name, is_spectator=True)
+    return True
+
+async def _handle_spectator_subscribe_leaderboard(session: ConnectionSession, message: SubscribeLeaderboardMessage, websocket: WebSocket) -> bool:
+    await game_manager.handle_leaderboard_subscribe(session.room_id, None, message.payload, websocket)
+    return True
+
+# Tabelas de despacho por tipo de mensagem. Mensagens de jogadores já associados a
+# uma sala são despachadas pela tabela do GameManager.
+PRE_ROOM_HANDLERS: Dict[str, SessionHandler] = {
+    "create_room": _handle_create_room,
+    "join_room": _handle_join_room,
+    "spectate_room": _handle_spectate_room,
+}
+SPECTATOR_HANDLERS: Dict[str, SessionHandler] = {
+    "subscribe_leaderboard": _handle_spectator_subscribe_leaderboard,
+}
+
+async def _receive_raw(websocket: WebSocket) -> Union[str, bytes]:
+    """Recebe o frame bruto (texto ou binário) sem decodificar o JSON."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    return message.get("text") if message.get("text") is not None else message.get("bytes", b"")
+
 # Este endpoint é um ponto de entrada genérico.
 # A primeira mensagem do cliente determinará se é CREATE_ROOM ou JOIN_ROOM.
 # Ou, podemos ter endpoints separados para clareza, mas para simplificar o cliente,
@@ -18,95 +106,71 @@ async def websocket_endpoint_entry(websocket: WebSocket, user_name: str):
     """
     Ponto de entrada principal para conexões WebSocket.
     O cliente deve enviar uma mensagem inicial especificando a ação:
-    - {"type": "create_room"}
+    - {"type": "create_room"} (ou {"type": "create_room", "payload": {"tournament_id": "ABCD1234"}})
     - {"type": "join_room", "payload": {"room_id": "XYZ123"}}
+    - {"type": "spectate_room", "payload": {"room_id": "XYZ123"}} (somente leitura)
+    Frames desconhecidos ou malformados são rejeitados antes de qualquer acesso à sala.
     """
     # Aceita a conexão preliminarmente. A associação à sala e ao ConnectionManager
     # ocorrerá após o cliente enviar a mensagem de 'create_room' ou 'join_room'.
     await websocket.accept()
     logger.info(f"WS conexão preliminar aceita para usuário '{user_name}' ({websocket.client}). Aguardando ação.")
     
-    current_room_id: str | None = None
+    session = ConnectionSession(user_name)
 
     try:
         while True:
-            data = await websocket.receive_json()
-            message_type = data.get("type")
-            payload = data.get("payload", {})
-            
-            logger.info(f"WS msg de '{user_name}': tipo='{message_type}', payload='{payload}'")
-
-            if not current_room_id: # Se ainda não associado a uma sala
-                if message_type == "create_room":
-                    room_id_created = await game_manager.handle_create_room(user_name, websocket)
-                    if room_id_created:
-                        current_room_id = room_id_created
-                        # Mensagem de sucesso já é enviada por handle_create_room (via handle_player_join)
-                    else:
-                        # Erro ao criar sala, fechar conexão ou enviar erro específico
-                        await conn_manager.send_personal_message({"type": "create_room_error", "message": "Falha ao criar sala."}, websocket)
-                        break # Encerra o loop e a conexão
-                
-                elif message_type == "join_room":
-                    room_id_to_join = payload.get("room_id")
-                    if not room_id_to_join:
-                        await conn_manager.send_personal_message({"type": "join_room_error", "message": "ID da sala não fornecido."}, websocket)
-                        continue # Espera próxima mensagem
-
-                    # Conecta ao ConnectionManager ANTES de chamar handle_player_join
-                    # para que o websocket já esteja no pool do conn_manager para broadcasts.
-                    await conn_manager.connect(websocket, room_id_to_join, user_name)
-                    await game_manager.handle_player_join(room_id_to_join, user_name, websocket)
-                    # Se o join for bem-sucedido, o handle_player_join envia 'join_room_success'
-                    # Se falhar, handle_player_join envia 'join_room_error'
-                    # Precisamos saber se o join foi bem-sucedido para definir current_room_id
-                    # Uma forma é o handle_player_join retornar um status ou o cliente confirmar.
-                    # Por ora, assumimos que se não houver erro, o join foi ok.
-                    # Se o join falhar e o cliente não receber 'join_room_success', ele deve tratar.
-                    # Se o join falhar, o conn_manager.disconnect deve ser chamado.
-                    # Vamos simplificar: se handle_player_join não levantar exceção e enviar sucesso,
-                    # então current_room_id é definido.
-                    # Se o join falhar (sala não existe, jogo em progresso), o handle_player_join envia erro.
-                    # O cliente deve tratar isso. Se o cliente desconectar após erro, ok.
-                    # Se o cliente continuar enviando msgs sem current_room_id, este loop trata.
-                    
-                    # Verificando se a sala existe no game_manager para definir current_room_id
-                    if room_id_to_join in game_manager.rooms_data and user_name in game_manager.rooms_data[room_id_to_join].players:
-                         current_room_id = room_id_to_join
-                    else:
-                        # O join falhou (provavelmente handle_player_join enviou erro e desconectou o websocket do conn_manager)
-                        # Se o websocket ainda estiver ativo aqui, é um estado inconsistente.
-                        logger.warning(f"Tentativa de join de '{user_name}' à sala '{room_id_to_join}' falhou ou estado inconsistente.")
-                        await conn_manager.disconnect(websocket, room_id_to_join) # Garante desconexão
-                        break
-
-
-                else:
-                    await conn_manager.send_personal_message({"type": "error", "message": "Ação inicial inválida. Envie 'create_room' ou 'join_room'."}, websocket)
-                    # Poderia desconectar aqui se a primeira mensagem não for válida.
+            raw = await _receive_raw(websocket)
+            heartbeat_monitor.touch(websocket) # Qualquer frame conta como sinal de vida
+            try:
+                message = parse_inbound_message(raw)
+            except ValidationError as e:
+                logger.info(f"WS frame inválido de '{user_name}': {e.error_count()} erro(s) de validação.")
+                await conn_manager.send_personal_message({"type": "error", "message": "Mensagem inválida."}, websocket)
+                continue
+
+            if message.type == "pong":
+                continue
             
-            else: # Já associado a uma sala (current_room_id está definido)
+            logger.info(f"WS msg de '{user_name}': tipo='{message.type}', payload='{message.payload}'")
+
+            if not session.room_id: # Se ainda não associado a uma sala
+                handler = PRE_ROOM_HANDLERS.get(message.type)
+                if handler is None:
+                    await conn_manager.send_personal_message({"type": "error", "message": "Ação inicial inválida. Envie 'create_room', 'join_room' ou 'spectate_room'."}, websocket)
+                    continue
+                if not await handler(session, message, websocket):
+                    break # Encerra o loop e a conexão
+
+            elif session.is_spectator: # Espectadores só recebem frames, não enviam ações de jogo
+                handler = SPECTATOR_HANDLERS.get(message.type)
+                if handler is None:
+                    await conn_manager.send_personal_message({"type": "error", "message": "Espectadores não podem enviar ações."}, websocket)
+                    continue
+                await handler(session, message, websocket)
+
+            else: # Já associado a uma sala
                 # Passa a mensagem para o GameManager processar
-                await game_manager.process_client_message(current_room_id, user_name, data, websocket)
+                await game_manager.process_client_message(session.room_id, user_name, message, websocket)
 
     except WebSocketDisconnect:
-        logger.info(f"WS Desconexão: '{user_name}' ({websocket.client})" + (f" da sala '{current_room_id}'" if current_room_id else ""))
-        if current_room_id:
-            conn_manager.disconnect(websocket, current_room_id) # Remove do ConnectionManager
-            await game_manager.process_disconnect(current_room_id, user_name, websocket) # Notifica GameManager
+        logger.info(f"WS Desconexão: '{user_name}' ({websocket.client})" + (f" da sala '{session.room_id}'" if session.room_id else ""))
+        if session.room_id:
+            await _cleanup_connection(websocket, session.room_id, user_name, session.is_spectator)
     except Exception as e:
-        logger.error(f"Erro inesperado no WebSocket para '{user_name}' ({websocket.client})" + (f" na sala '{current_room_id}'" if current_room_id else "") + f": {e}", exc_info=True)
-        if current_room_id:
-            conn_manager.disconnect(websocket, current_room_id)
-            await game_manager.process_disconnect(current_room_id, user_name, websocket) # Trata como desconexão
+        logger.error(f"Erro inesperado no WebSocket para '{user_name}' ({websocket.client})" + (f" na sala '{session.room_id}'" if session.room_id else "") + f": {e}", exc_info=True)
+        if session.room_id: # Trata como desconexão
+            await _cleanup_connection(websocket, session.room_id, user_name, session.is_spectator)
         try:
             await websocket.close(code=1011) # Internal Error
         except Exception:
             pass # Conexão pode já estar fechada
     finally:
-        # Garante que se current_room_id foi definido mas a desconexão não foi tratada acima,
+        # Garante que se a sala foi definida mas a desconexão não foi tratada acima,
         # tentamos uma última vez.
-        if current_room_id and websocket in conn_manager.websocket_users:
-            logger.warning(f"Limpando conexão de '{user_name}' da sala '{current_room_id}' no bloco finally.")
-            conn_manager.disconnect(websocket, current_room_id)
-            # Não chamar game_manager.process_disconnect aqui para evitar chamadas duplas se já tratado.
\ No newline at end of file
+        heartbeat_monitor.unregister(websocket)
+        tournament_manager.unsubscribe(websocket)
+        if session.room_id and websocket in conn_manager.websocket_users:
+            logger.warning(f"Limpando conexão de '{user_name}' da sala '{session.room_id}' no bloco finally.")
+            conn_manager.disconnect(websocket, session.room_id)
+            # Não chamar game_manager.process_disconnect aqui para evitar chamadas duplas se já tratado.
@@ -24,6 +24,7 @@ class GameRoomStateSchema(BaseModel):
     current_question_index: int = -1
     game_status: str = "waiting"  # waiting, active, finished
     player_order: List[str] = # Ordem de entrada dos jogadores
+    tournament_id: Optional[str] = None # Torneio ao qual a sala pertence, se houver
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,68 @@
+from pydantic import BaseModel, Field, StrictInt, StrictStr, TypeAdapter
+from typing import Annotated, Literal, Optional, Union
+
+# Mensagens recebidas pelo WebSocket. Todas são validadas por um único TypeAdapter
+# (discriminado por "type"), compilado uma vez na importação do módulo.
+
+class EmptyPayload(BaseModel):
+    pass
+
+class CreateRoomPayload(BaseModel):
+    tournament_id: Optional[StrictStr] = Field(default=None, max_length=32)
+
+class RoomPayload(BaseModel):
+    room_id: StrictStr = Field(min_length=1, max_length=32)
+
+class SubmitAnswerPayload(BaseModel):
+    answer: StrictStr = Field(max_length=500)
+    question_id: StrictInt = Field(ge=0) # Índice da pergunta no array de perguntas da sala
+
+class SubscribeLeaderboardPayload(BaseModel):
+    top_n: StrictInt = Field(default=10, ge=1)
+
+class CreateRoomMessage(BaseModel):
+    type: Literal["create_room"]
+    payload: CreateRoomPayload = Field(default_factory=CreateRoomPayload)
+
+class JoinRoomMessage(BaseModel):
+    type: Literal["join_room"]
+    payload: RoomPayload
+
+class SpectateRoomMessage(BaseModel):
+    type: Literal["spectate_room"]
+    payload: RoomPayload
+
+class StartGameMessage(BaseModel):
+    type: Literal["start_game"]
+    payload: EmptyPayload = Field(default_factory=EmptyPayload)
+
+class SubmitAnswerMessage(BaseModel):
+    type: Literal["submit_answer"]
+    payload: SubmitAnswerPayload
+
+class SubscribeLeaderboardMessage(BaseModel):
+    type: Literal["subscribe_leaderboard"]
+    payload: SubscribeLeaderboardPayload = Field(default_factory=SubscribeLeaderboardPayload)
+
+class PongMessage(BaseModel):
+    type: Literal["pong"]
+    payload: EmptyPayload = Field(default_factory=EmptyPayload)
+
+InboundMessage = Annotated[
+    Union[
+        CreateRoomMessage,
+        JoinRoomMessage,
+        SpectateRoomMessage,
+        StartGameMessage,
+        SubmitAnswerMessage,
+        SubscribeLeaderboardMessage,
+        PongMessage,
+    ],
+    Field(discriminator="type"),
+]
+
+inbound_message_adapter = TypeAdapter(InboundMessage)
+
+def parse_inbound_message(raw: Union[str, bytes]) -> InboundMessage:
+    """Faz o parse e a validação do frame bruto em uma única passada. Levanta pydantic.ValidationError."""
+    return inbound_message_adapter.validate_json(raw)
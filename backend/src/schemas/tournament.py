@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List
+
+class TournamentCreate(BaseModel):
+    name: str
+
+class TournamentRead(BaseModel):
+    tournament_id: str
+    name: str
+    room_ids: List[str] = []
+    total_questions: int
+    total_players: int = 0
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    room_id: str
+    player_name: str
+    score: int
@@ -0,0 +1,203 @@
+import asyncio
+from array import array
+from typing import Dict, List, Optional, Any
+from app.core.config import settings
+from app.crud.crud_question_stats import add_question_stats_deltas, get_question_stats
+from app.database.setup import get_session
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _zeros(size: int) -> array:
+    return array("q", bytes(8 * size))
+
+
+class AnswerAnalytics:
+    """
+    Estatísticas por pergunta (acerto, distribuição das opções e tempo de resposta).
+
+    Cada resposta incrementa apenas alguns contadores em arrays colunares
+    indexados pela linha da pergunta. Periodicamente o buffer é trocado por um
+    novo e os contadores não nulos são somados à tabela `QuestionStats` em uma
+    única transação. Os totais acumulados alimentam os pesos usados no sorteio
+    das perguntas das salas.
+    """
+
+    def __init__(self, flush_interval_s: int = 30):
+        self.flush_interval = flush_interval_s
+        self._rows: Dict[int, int] = {} # question_id -> linha
+        self._question_ids: List[int] = []
+        self._option_index: List[Dict[str, int]] = [] # por linha: texto normalizado da opção -> índice
+        self._width = 0 # Maior número de opções entre as perguntas
+
+        # Buffer de deltas ainda não persistidos
+        self._answered = _zeros(0)
+        self._correct = _zeros(0)
+        self._timed = _zeros(0)
+        self._response_ms = _zeros(0)
+        self._option_counts = _zeros(0) # Matriz linhas x _width achatada
+        self._dirty = False
+
+        # Totais acumulados (banco + deltas já persistidos), usados nos pesos
+        self._total_answered = _zeros(0)
+        self._total_correct = _zeros(0)
+        self.weights: Optional[List[float]] = None # Alinhado com a ordem de `configure`
+
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+
+    def configure(self, questions: List[Dict[str, Any]]):
+        """Define o layout das colunas a partir do pool de perguntas."""
+        self._question_ids = [q["id"] for q in questions]
+        self._rows = {question_id: row for row, question_id in enumerate(self._question_ids)}
+        self._option_index = [
+            {str(option).strip().lower(): i for i, option in enumerate(q["options"])} for q in questions
+        ]
+        self._width = max((len(q["options"]) for q in questions), default=0)
+        self._reset_buffer()
+        self._total_answered = _zeros(len(questions))
+        self._total_correct = _zeros(len(questions))
+        self._update_weights()
+
+    def _reset_buffer(self):
+        size = len(self._question_ids)
+        self._answered = _zeros(size)
+        self._correct = _zeros(size)
+        self._timed = _zeros(size)
+        self._response_ms = _zeros(size)
+        self._option_counts = _zeros(size * self._width)
+        self._dirty = False
+
+    def _restore_buffer(self, answered: array, correct: array, timed: array, response_ms: array, option_counts: array):
+        """Soma ao buffer atual os contadores de um flush que falhou."""
+        if len(answered) != len(self._answered) or len(option_counts) != len(self._option_counts):
+            logger.warning("Layout das perguntas mudou; contadores do flush com falha descartados.")
+            return
+        for live, failed in ((self._answered, answered), (self._correct, correct), (self._timed, timed),
+                             (self._response_ms, response_ms), (self._option_counts, option_counts)):
+            for i, value in enumerate(failed):
+                if value:
+                    live[i] += value
+        self._dirty = True
+
+    def record(self, question_id: int, answer: Any, is_correct: bool, response_ms: Optional[int]):
+        """Registra uma resposta: apenas incrementos nos contadores em memória."""
+        row = self._rows.get(question_id)
+        if row is None:
+            return
+        self._answered[row] += 1
+        if is_correct:
+            self._correct[row] += 1
+        if response_ms is not None:
+            self._timed[row] += 1
+            self._response_ms[row] += response_ms
+        option = self._option_index[row].get(str(answer).strip().lower())
+        if option is not None:
+            self._option_counts[row * self._width + option] += 1
+        self._dirty = True
+
+    # --- Agregados / pesos ---
+
+    def load_aggregates(self):
+        """Carrega os totais já persistidos para calcular os pesos iniciais."""
+        db_session_gen = get_session()
+        db = next(db_session_gen)
+        try:
+            for stats in get_question_stats(db):
+                row = self._rows.get(stats.question_id)
+                if row is not None:
+                    self._total_answered[row] = stats.times_answered
+                    self._total_correct[row] = stats.times_correct
+        finally:
+            db.close()
+        self._update_weights()
+
+    def _update_weights(self):
+        # Acurácia suavizada (Laplace); perguntas com acerto perto de 50% pesam mais
+        # que as muito fáceis ou muito difíceis. Peso entre 0.5 e 1.0.
+        weights = []
+        for answered, correct in zip(self._total_answered, self._total_correct):
+            accuracy = (correct + 1) / (answered + 2)
+            weights.append(0.5 + 2 * accuracy * (1 - accuracy))
+        self.weights = weights
+
+    # --- Flush em lote ---
+
+    def start(self):
+        if self._task:
+            return
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Encerra a tarefa de fundo sem cancelá-la (um flush em andamento termina
+        antes) e faz um flush final. Falhas são apenas registradas, para não
+        interromper o encerramento dos demais serviços.
+        """
+        if not self._task:
+            return
+        self._stop_event.set()
+        await self._task
+        self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Erro no flush final das estatísticas das perguntas: {e}", exc_info=True)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self.flush_interval)
+                return # `stop` faz o flush final
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Erro ao persistir estatísticas das perguntas: {e}", exc_info=True)
+
+    async def flush(self):
+        """Troca o buffer por um novo e persiste os deltas não nulos em uma única transação."""
+        if not self._dirty:
+            return
+        answered, correct, timed = self._answered, self._correct, self._timed
+        response_ms, option_counts, width = self._response_ms, self._option_counts, self._width
+        self._reset_buffer()
+
+        deltas = {
+            self._question_ids[row]: {
+                "times_answered": count,
+                "times_correct": correct[row],
+                "times_timed": timed[row],
+                "total_response_ms": response_ms[row],
+                "option_counts": option_counts[row * width:(row + 1) * width].tolist(),
+            }
+            for row, count in enumerate(answered) if count
+        }
+
+        def write():
+            db_session_gen = get_session()
+            db = next(db_session_gen)
+            try:
+                add_question_stats_deltas(db, deltas=deltas)
+            finally:
+                db.close()
+
+        try:
+            await asyncio.to_thread(write)
+        except Exception:
+            # Devolve os contadores ao buffer para a próxima tentativa de flush
+            self._restore_buffer(answered, correct, timed, response_ms, option_counts)
+            raise
+        for row, count in enumerate(answered):
+            if count:
+                self._total_answered[row] += count
+                self._total_correct[row] += correct[row]
+        self._update_weights()
+        logger.info(f"Estatísticas de {len(deltas)} perguntas persistidas.")
+
+
+# Instância única das estatísticas de respostas
+answer_analytics = AnswerAnalytics(flush_interval_s=settings.ANALYTICS_FLUSH_INTERVAL_S)
@@ -10,6 +10,8 @@ class ConnectionManager:
         self.rooms: Dict] = {}
         # Armazena o nome de usuário associado a cada WebSocket: WebSocket -> user_name
         self.websocket_users: Dict = {}
+        # Espectadores (somente leitura) por sala, separados dos jogadores: room_id -> Set
+        self.spectators: Dict[str, Set[WebSocket]] = {}
 
     async def connect(self, websocket: WebSocket, room_id: str, user_name: str):
         """Aceita uma nova conexão WebSocket, a adiciona à sala e mapeia o usuário."""
@@ -31,6 +33,28 @@ class ConnectionManager:
                 logger.info(f"Sala {room_id} removida por estar vazia.")
         return user_name
 
+    def add_spectator(self, websocket: WebSocket, room_id: str):
+        """Registra um espectador na sala. A conexão já foi aceita pelo endpoint."""
+        self.spectators.setdefault(room_id, set()).add(websocket)
+        logger.info(f"Espectador ({websocket.client}) entrou na sala {room_id}. Espectadores: {len(self.spectators[room_id])}")
+
+    def remove_spectator(self, websocket: WebSocket, room_id: str):
+        """Remove um espectador da sala."""
+        room_spectators = self.spectators.get(room_id)
+        if room_spectators is None:
+            return
+        room_spectators.discard(websocket)
+        if not room_spectators:
+            del self.spectators[room_id]
+        logger.info(f"Espectador ({websocket.client}) saiu da sala {room_id}.")
+
+    def pop_spectators(self, room_id: str) -> Set:
+        """Remove e retorna todos os espectadores da sala (ex.: quando a sala é removida)."""
+        return self.spectators.pop(room_id, set())
+
+    def get_spectators_in_room(self, room_id: str) -> Set:
+        return self.spectators.get(room_id, set())
+
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Envia uma mensagem JSON pessoal para um WebSocket específico."""
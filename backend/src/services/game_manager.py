@@ -1,13 +1,23 @@
 import shortuuid
+import asyncio
 import json
 import random
-from typing import Dict, List, Optional, Any
+import heapq
+import time
+from typing import Dict, List, Optional, Any, Set
 from fastapi import WebSocket
 from app.services.connection_manager import manager as conn_manager # Renomeado para evitar conflito
 from app.schemas.game import GameRoomStateSchema, PlayerSchema, QuestionSchema
 from app.schemas.score import ScoreCreate
+from app.schemas.messages import (
+    InboundMessage, StartGameMessage, SubmitAnswerMessage, SubscribeLeaderboardMessage, SubscribeLeaderboardPayload
+)
 from app.crud.crud_score import create_score
 from app.database.setup import get_session
+from app.services.room_journal import room_journal
+from app.services.spectator_broadcaster import spectator_broadcaster
+from app.services.answer_analytics import answer_analytics
+from app.services.tournament_manager import tournament_manager, Tournament
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +28,20 @@ class GameManager:
     def __init__(self):
         self.rooms_data: Dict = {}
         self.questions_pool: List[Dict[str, Any]] = self._load_questions()
+        # Salas recuperadas do journal: room_id -> jogadores que ainda não reconectaram
+        self.awaiting_reconnect: Dict[str, Set[str]] = {}
+        # Momento (time.monotonic) em que a pergunta atual de cada sala foi enviada
+        self.question_started_at: Dict[str, float] = {}
+        # Ligado quando o servidor começa a encerrar: as desconexões em massa que
+        # se seguem não alteram as salas, para que o journal as preserve.
+        self.shutting_down = False
+        self._reconnect_deadline_task: Optional[asyncio.Task] = None
+        # Tabela de handlers das mensagens recebidas dentro de uma sala: tipo -> handler
+        self._message_handlers = {
+            "start_game": self._handle_start_game,
+            "submit_answer": self._handle_submit_answer,
+            "subscribe_leaderboard": self._handle_subscribe_leaderboard,
+        }
 
     def _load_questions(self) -> List[Dict[str, Any]]:
         """Carrega as perguntas do arquivo JSON."""
@@ -36,16 +60,36 @@ class GameManager:
     def _get_questions_for_room(self) -> List[Dict[str, Any]]:
         if not self.questions_pool:
             return
-        # Seleciona aleatoriamente NUMBER_OF_QUESTIONS perguntas
-        return random.sample(self.questions_pool, min(NUMBER_OF_QUESTIONS, len(self.questions_pool)))
+        count = min(NUMBER_OF_QUESTIONS, len(self.questions_pool))
+        weights = answer_analytics.weights
+        if not weights or len(weights) != len(self.questions_pool):
+            # Seleciona aleatoriamente NUMBER_OF_QUESTIONS perguntas
+            return random.sample(self.questions_pool, count)
+        # Amostragem ponderada sem reposição (Efraimidis-Spirakis) pelos pesos de dificuldade
+        selected = heapq.nlargest(count, range(len(weights)), key=lambda i: random.random() ** (1.0 / weights[i]))
+        return [self.questions_pool[i] for i in selected]
+
+    def create_tournament(self, name: str) -> Optional[Tournament]:
+        """Cria um torneio com uma única seleção de perguntas compartilhada por todas as suas salas."""
+        selected_raw_questions = self._get_questions_for_room()
+        if not selected_raw_questions:
+            return None
+        return tournament_manager.create_tournament(name, selected_raw_questions)
 
-    async def handle_create_room(self, creator_name: str, websocket: WebSocket) -> Optional[str]:
-        """Cria uma nova sala de jogo, retorna o ID da sala."""
+    async def handle_create_room(self, creator_name: str, websocket: WebSocket, tournament_id: Optional[str] = None) -> Optional[str]:
+        """Cria uma nova sala de jogo (opcionalmente dentro de um torneio), retorna o ID da sala."""
         room_id = shortuuid.uuid()[:6].upper()
         while room_id in self.rooms_data:
             room_id = shortuuid.uuid()[:6].upper()
 
-        selected_raw_questions = self._get_questions_for_room()
+        if tournament_id:
+            tournament = tournament_manager.get_tournament(tournament_id)
+            if not tournament:
+                await conn_manager.send_personal_message({"type": "error", "message": "Torneio não encontrado."}, websocket)
+                return None
+            selected_raw_questions = tournament.questions
+        else:
+            selected_raw_questions = self._get_questions_for_room()
         if not selected_raw_questions:
             await conn_manager.send_personal_message({"type": "error", "message": "Falha ao carregar perguntas para a sala."}, websocket)
             return None
@@ -64,12 +108,17 @@ class GameManager:
             questions=questions_for_schema,
             current_question_index=-1,
             game_status="waiting",
-            player_order=
+            player_order=,
+            tournament_id=tournament_id
         )
         # Armazena as respostas corretas internamente (não no schema enviado ao cliente)
         room_state.original_questions_with_answers = selected_raw_questions
         
         self.rooms_data[room_id] = room_state
+        if tournament_id:
+            tournament_manager.attach_room(tournament_id, room_id)
+        if room_journal.enabled:
+            room_journal.record("create", room_id, self._room_to_snapshot(room_state))
         logger.info(f"Sala {room_id} criada por {creator_name}.")
         
         # Conecta o criador à sala e ao ConnectionManager
@@ -84,6 +133,10 @@ class GameManager:
             await conn_manager.send_personal_message({"type": "join_room_error", "message": "Sala não encontrada."}, websocket)
             return
 
+        if user_name in self.awaiting_reconnect.get(room_id, ()):
+            await self._handle_player_reconnect(room_id, user_name, websocket)
+            return
+
         if room_state.game_status!= "waiting":
             await conn_manager.send_personal_message({"type": "join_room_error", "message": "Jogo já em progresso ou finalizado."}, websocket)
             return
@@ -97,6 +150,9 @@ class GameManager:
         room_state.players[user_name] = PlayerSchema(name=user_name, answers=[None] * len(room_state.questions))
         if user_name not in room_state.player_order: # Evita duplicatas se houver lógica de reconexão
             room_state.player_order.append(user_name)
+        room_journal.record("join", room_id, {"user": user_name})
+        if room_state.tournament_id:
+            tournament_manager.add_player(room_state.tournament_id, room_id, user_name)
         
         logger.info(f"Jogador {user_name} adicionado ao estado da sala {room_id}.")
 
@@ -111,103 +167,186 @@ class GameManager:
         # Notificar outros jogadores na sala
         await self._broadcast_room_update(room_id)
 
+    async def _handle_player_reconnect(self, room_id: str, user_name: str, websocket: WebSocket):
+        """Reassocia um jogador a uma sala recuperada do journal após um restart."""
+        room_state = self.rooms_data[room_id]
+        pending = self.awaiting_reconnect[room_id]
+        pending.discard(user_name)
+        if not pending:
+            del self.awaiting_reconnect[room_id]
+        logger.info(f"Jogador {user_name} reconectado à sala recuperada {room_id}.")
+
+        await conn_manager.send_personal_message({
+            "type": "join_room_success",
+            "room_id": room_id,
+            "is_host": (user_name == room_state.host_name),
+            "room_state": room_state.model_dump(exclude={'original_questions_with_answers'})
+        }, websocket)
+
+        # Se o jogo estava em andamento, reenvia a pergunta atual para o jogador continuar
+        if room_state.game_status == "active" and 0 <= room_state.current_question_index < len(room_state.questions):
+            await conn_manager.send_personal_message({
+                "type": "new_question",
+                "question": room_state.questions[room_state.current_question_index].model_dump(),
+                "question_number": room_state.current_question_index + 1,
+                "total_questions": len(room_state.questions)
+            }, websocket)
 
-    async def process_client_message(self, room_id: str, user_name: str, data: dict, websocket: WebSocket):
-        message_type = data.get("type")
-        payload = data.get("payload", {})
+        await self._broadcast_room_update(room_id, exclude_websocket=websocket)
+
+    async def handle_spectator_join(self, room_id: str, websocket: WebSocket) -> bool:
+        """Associa uma conexão somente leitura à sala. Espectadores não entram em `players`."""
         room_state = self.rooms_data.get(room_id)
+        if not room_state:
+            await conn_manager.send_personal_message({"type": "spectate_room_error", "message": "Sala não encontrada."}, websocket)
+            return False
+
+        conn_manager.add_spectator(websocket, room_id)
+        current_question = None
+        if room_state.game_status == "active" and 0 <= room_state.current_question_index < len(room_state.questions):
+            current_question = room_state.questions[room_state.current_question_index].model_dump()
+        await conn_manager.send_personal_message({
+            "type": "spectate_room_success",
+            "room_id": room_id,
+            "room_state": room_state.model_dump(exclude={'original_questions_with_answers'}),
+            "question": current_question
+        }, websocket)
+        return True
+
+
+    async def process_client_message(self, room_id: str, user_name: str, message: InboundMessage, websocket: WebSocket):
+        """Despacha uma mensagem já validada para o handler registrado para o seu tipo."""
+        handler = self._message_handlers.get(message.type)
+        if handler is None:
+            await conn_manager.send_personal_message({"type": "error", "message": f"Ação '{message.type}' inválida dentro de uma sala."}, websocket)
+            return
 
+        room_state = self.rooms_data.get(room_id)
         if not room_state:
             await conn_manager.send_personal_message({"type": "error", "message": "Sala não encontrada."}, websocket)
             return
 
-        if message_type == "start_game":
-            if user_name == room_state.host_name and room_state.game_status == "waiting":
-                room_state.game_status = "active"
-                room_state.current_question_index = 0
-                
-                if not room_state.questions: # Caso as perguntas não tenham sido carregadas
-                    logger.error(f"Tentativa de iniciar jogo na sala {room_id} sem perguntas carregadas.")
-                    await conn_manager.broadcast_to_room(room_id, {"type": "error", "message": "Erro interno: Não foi possível carregar as perguntas."})
-                    room_state.game_status = "waiting" # Reverte o status
+        await handler(room_id, room_state, user_name, message, websocket)
+
+    async def _handle_start_game(self, room_id: str, room_state: GameRoomStateSchema, user_name: str, message: StartGameMessage, websocket: WebSocket):
+        if user_name == room_state.host_name and room_state.game_status == "waiting":
+            room_state.game_status = "active"
+            room_state.current_question_index = 0
+            
+            if not room_state.questions: # Caso as perguntas não tenham sido carregadas
+                logger.error(f"Tentativa de iniciar jogo na sala {room_id} sem perguntas carregadas.")
+                await conn_manager.broadcast_to_room(room_id, {"type": "error", "message": "Erro interno: Não foi possível carregar as perguntas."})
+                room_state.game_status = "waiting" # Reverte o status
+                return
+
+            current_question_data = room_state.questions[room_state.current_question_index]
+            room_journal.record("start", room_id)
+            
+            game_started_message = {
+                "type": "game_started",
+                "question": current_question_data.model_dump(),
+                "question_number": 1,
+                "total_questions": len(room_state.questions)
+            }
+            self.question_started_at[room_id] = time.monotonic()
+            await conn_manager.broadcast_to_room(room_id, game_started_message)
+            spectator_broadcaster.publish(room_id, "question", game_started_message)
+            logger.info(f"Jogo iniciado na sala {room_id} por {user_name}.")
+        elif user_name!= room_state.host_name:
+            await conn_manager.send_personal_message({"type": "error", "message": "Apenas o host pode iniciar o jogo."}, websocket)
+        elif room_state.game_status!= "waiting":
+            await conn_manager.send_personal_message({"type": "error", "message": f"O jogo não pode ser iniciado (status: {room_state.game_status})."}, websocket)
+
+    async def _handle_submit_answer(self, room_id: str, room_state: GameRoomStateSchema, user_name: str, message: SubmitAnswerMessage, websocket: WebSocket):
+        if room_state.game_status == "active" and room_state.current_question_index < len(room_state.questions):
+            player = room_state.players.get(user_name)
+            if player and not player.finished_game:
+                answer_text = message.payload.answer
+                question_idx_answered = message.payload.question_id # ID da pergunta (índice no array de perguntas do jogo)
+
+                # Validar se a resposta é para a pergunta atual
+                if question_idx_answered!= room_state.current_question_index:
+                    await conn_manager.send_personal_message({"type": "error", "message": "Resposta para pergunta incorreta ou fora de ordem."}, websocket)
                     return
 
-                current_question_data = room_state.questions[room_state.current_question_index]
+                player.answers[question_idx_answered] = answer_text
                 
-                await conn_manager.broadcast_to_room(room_id, {
-                    "type": "game_started",
-                    "question": current_question_data.model_dump(),
-                    "question_number": 1,
-                    "total_questions": len(room_state.questions)
+                correct_answer = room_state.original_questions_with_answers[question_idx_answered]["correct_answer"]
+                points_for_question = room_state.original_questions_with_answers[question_idx_answered]["points"]
+                is_correct = (str(answer_text).strip().lower() == str(correct_answer).strip().lower())
+
+                if is_correct:
+                    player.score += points_for_question
+                    if room_state.tournament_id:
+                        tournament_manager.record_score(room_state.tournament_id, room_id, user_name, points_for_question)
+
+                started_at = self.question_started_at.get(room_id)
+                answer_analytics.record(
+                    room_state.original_questions_with_answers[question_idx_answered]["id"], answer_text, is_correct,
+                    int((time.monotonic() - started_at) * 1000) if started_at is not None else None
+                )
+                finished = all(ans is not None for ans in player.answers)
+                room_journal.record("answer", room_id, {
+                    "user": user_name, "q": question_idx_answered, "answer": answer_text,
+                    "score": player.score, "finished": finished,
                 })
-                logger.info(f"Jogo iniciado na sala {room_id} por {user_name}.")
-            elif user_name!= room_state.host_name:
-                await conn_manager.send_personal_message({"type": "error", "message": "Apenas o host pode iniciar o jogo."}, websocket)
-            elif room_state.game_status!= "waiting":
-                await conn_manager.send_personal_message({"type": "error", "message": f"O jogo não pode ser iniciado (status: {room_state.game_status})."}, websocket)
-
-        elif message_type == "submit_answer":
-            if room_state.game_status == "active" and room_state.current_question_index < len(room_state.questions):
-                player = room_state.players.get(user_name)
-                if player and not player.finished_game:
-                    answer_text = payload.get("answer")
-                    question_idx_answered = payload.get("question_id") # ID da pergunta (índice no array de perguntas do jogo)
-
-                    # Validar se a resposta é para a pergunta atual
-                    if question_idx_answered!= room_state.current_question_index:
-                        await conn_manager.send_personal_message({"type": "error", "message": "Resposta para pergunta incorreta ou fora de ordem."}, websocket)
-                        return
-
-                    player.answers[question_idx_answered] = answer_text
-                    
-                    correct_answer = room_state.original_questions_with_answers[question_idx_answered]["correct_answer"]
-                    points_for_question = room_state.original_questions_with_answers[question_idx_answered]["points"]
-                    is_correct = (str(answer_text).strip().lower() == str(correct_answer).strip().lower())
-
-                    if is_correct:
-                        player.score += points_for_question
-
-                    await conn_manager.send_personal_message({
-                        "type": "answer_result",
-                        "question_id": room_state.questions[question_idx_answered].id,
-                        "is_correct": is_correct,
-                        "your_score": player.score
-                    }, websocket)
-                    
-                    logger.info(f"Jogador {user_name} (sala {room_id}) respondeu Q{question_idx_answered+1}: '{answer_text}' (Correta: {is_correct}). Pontuação: {player.score}")
-
-                    # Atualizar scores para todos (opcional, pode ser feito menos frequentemente)
-                    await self._broadcast_score_update(room_id)
-
-                    # Verificar se este jogador terminou todas as perguntas
-                    if all(ans is not None for ans in player.answers):
-                        player.finished_game = True
-                        logger.info(f"Jogador {user_name} terminou todas as perguntas na sala {room_id}.")
-                        # A regra é: "quando um jogador terminar, o jogo fechar para todos"
-                        # Aqui, consideramos o "host" como o jogador que dita o fim.
-                        # Se o host terminar, o jogo acaba.
-                        if user_name == room_state.host_name:
-                            logger.info(f"Host {user_name} terminou. Finalizando jogo para sala {room_id}.")
-                            await self._finalize_game_for_all(room_id)
-                            return # Jogo finalizado
-
-                    # Verificar se todos os jogadores ativos responderam à pergunta atual
-                    # para então avançar para a próxima.
-                    all_active_players_answered_current_q = True
-                    for p_name_loop, p_obj_loop in room_state.players.items():
-                        # Considera apenas jogadores que ainda estão conectados (presentes no conn_manager)
-                        # e que não terminaram o jogo ainda.
-                        if p_name_loop in conn_manager.get_users_in_room(room_id) and \
-                           not p_obj_loop.finished_game and \
-                           p_obj_loop.answers[room_state.current_question_index] is None:
-                            all_active_players_answered_current_q = False
-                            break
-                    
-                    if all_active_players_answered_current_q:
-                        await self._check_next_question_or_end_game(room_id)
 
-            elif room_state.game_status!= "active":
-                 await conn_manager.send_personal_message({"type": "error", "message": "Não é possível submeter resposta: jogo não está ativo."}, websocket)
+                await conn_manager.send_personal_message({
+                    "type": "answer_result",
+                    "question_id": room_state.questions[question_idx_answered].id,
+                    "is_correct": is_correct,
+                    "your_score": player.score
+                }, websocket)
+                
+                logger.info(f"Jogador {user_name} (sala {room_id}) respondeu Q{question_idx_answered+1}: '{answer_text}' (Correta: {is_correct}). Pontuação: {player.score}")
+
+                # Atualizar scores para todos (opcional, pode ser feito menos frequentemente)
+                await self._broadcast_score_update(room_id)
+
+                # Verificar se este jogador terminou todas as perguntas
+                if finished:
+                    player.finished_game = True
+                    logger.info(f"Jogador {user_name} terminou todas as perguntas na sala {room_id}.")
+                    # A regra é: "quando um jogador terminar, o jogo fechar para todos"
+                    # Aqui, consideramos o "host" como o jogador que dita o fim.
+                    # Se o host terminar, o jogo acaba.
+                    if user_name == room_state.host_name:
+                        logger.info(f"Host {user_name} terminou. Finalizando jogo para sala {room_id}.")
+                        await self._finalize_game_for_all(room_id)
+                        return # Jogo finalizado
+
+                # Verificar se todos os jogadores ativos responderam à pergunta atual
+                # para então avançar para a próxima.
+                all_active_players_answered_current_q = True
+                for p_name_loop, p_obj_loop in room_state.players.items():
+                    # Considera apenas jogadores que ainda estão conectados (presentes no conn_manager)
+                    # e que não terminaram o jogo ainda.
+                    if p_name_loop in conn_manager.get_users_in_room(room_id) and \
+                       not p_obj_loop.finished_game and \
+                       p_obj_loop.answers[room_state.current_question_index] is None:
+                        all_active_players_answered_current_q = False
+                        break
+                
+                if all_active_players_answered_current_q:
+                    await self._check_next_question_or_end_game(room_id)
+
+        elif room_state.game_status!= "active":
+             await conn_manager.send_personal_message({"type": "error", "message": "Não é possível submeter resposta: jogo não está ativo."}, websocket)
+
+    async def _handle_subscribe_leaderboard(self, room_id: str, room_state: GameRoomStateSchema, user_name: str, message: SubscribeLeaderboardMessage, websocket: WebSocket):
+        await self.handle_leaderboard_subscribe(room_id, user_name, message.payload, websocket)
+
+    async def handle_leaderboard_subscribe(self, room_id: str, user_name: Optional[str], payload: SubscribeLeaderboardPayload, websocket: WebSocket):
+        """Inscreve a conexão no ranking do torneio da sala (top N + posição do próprio jogador)."""
+        room_state = self.rooms_data.get(room_id)
+        if not room_state or not room_state.tournament_id:
+            await conn_manager.send_personal_message({"type": "error", "message": "A sala não faz parte de um torneio."}, websocket)
+            return
+        # Espectadores (user_name None) recebem apenas o top N
+        player_key = (room_id, user_name) if user_name in room_state.players else None
+        subscribed = await tournament_manager.subscribe(websocket, room_state.tournament_id, payload.top_n, player_key)
+        if not subscribed:
+            await conn_manager.send_personal_message({"type": "error", "message": "Torneio não encontrado."}, websocket)
 
 
     async def _check_next_question_or_end_game(self, room_id: str):
@@ -228,13 +367,17 @@ class GameManager:
         # Avançar para a próxima pergunta
         if room_state.current_question_index < len(room_state.questions) - 1:
             room_state.current_question_index += 1
+            room_journal.record("advance", room_id, {"q": room_state.current_question_index})
             next_question_data = room_state.questions[room_state.current_question_index]
-            await conn_manager.broadcast_to_room(room_id, {
+            new_question_message = {
                 "type": "new_question",
                 "question": next_question_data.model_dump(),
                 "question_number": room_state.current_question_index + 1,
                 "total_questions": len(room_state.questions)
-            })
+            }
+            self.question_started_at[room_id] = time.monotonic()
+            await conn_manager.broadcast_to_room(room_id, new_question_message)
+            spectator_broadcaster.publish(room_id, "question", new_question_message)
             logger.info(f"Próxima pergunta ({room_state.current_question_index + 1}) enviada para sala {room_id}.")
         else:
             # Todas as perguntas foram enviadas. Finalizar o jogo.
@@ -247,6 +390,8 @@ class GameManager:
             return
 
         room_state.game_status = "finished"
+        self.awaiting_reconnect.pop(room_id, None)
+        self.question_started_at.pop(room_id, None)
         logger.info(f"Jogo finalizado para todos na sala {room_id}.")
 
         final_scores_dict = {name: p.score for name, p in room_state.players.items()}
@@ -264,11 +409,15 @@ class GameManager:
             logger.error(f"Erro ao salvar pontuações para sala {room_id}: {e}")
         finally:
             db.close()
+        # Registrado após a persistência: na recuperação, a sala finalizada é descartada
+        room_journal.record("finalize", room_id)
 
-        await conn_manager.broadcast_to_room(room_id, {
+        game_over_message = {
             "type": "game_over_for_all",
             "final_scores": final_scores_dict
-        })
+        }
+        await conn_manager.broadcast_to_room(room_id, game_over_message)
+        spectator_broadcaster.publish(room_id, "final", game_over_message)
         
         # Opcional: Limpar dados da sala da memória após o jogo
         # if room_id in self.rooms_data:
@@ -276,7 +425,33 @@ class GameManager:
         #     logger.info(f"Dados da sala {room_id} limpos da memória após o jogo.")
 
 
+    async def _drop_room(self, room_id: str):
+        """Remove uma sala que não chegou ao fim do jogo e avisa os espectadores."""
+        room_state = self.rooms_data.pop(room_id, None)
+        if room_state and room_state.tournament_id:
+            tournament_manager.detach_room(room_state.tournament_id, room_id)
+        self.question_started_at.pop(room_id, None)
+        self.awaiting_reconnect.pop(room_id, None)
+        room_journal.record("drop", room_id)
+
+        spectators = conn_manager.pop_spectators(room_id)
+        if spectators:
+            closed_message = {"type": "room_closed", "room_id": room_id, "message": "A sala foi encerrada."}
+            await asyncio.gather(*(conn_manager.send_personal_message(closed_message, ws) for ws in spectators))
+            # Fecha as conexões; o endpoint faz a limpeza restante ao receber a desconexão
+            await asyncio.gather(*(ws.close(code=1000) for ws in spectators), return_exceptions=True)
+
+    def begin_shutdown(self):
+        """Congela o estado das salas antes de o servidor fechar as conexões."""
+        if not self.shutting_down:
+            self.shutting_down = True
+            logger.info("Encerramento em andamento: desconexões não alteram mais o estado das salas.")
+
     async def process_disconnect(self, room_id: str, user_name: str, websocket: WebSocket):
+        if self.shutting_down:
+            # A sala segue no journal com o jogador, que poderá reconectar após o restart
+            logger.info(f"Jogador {user_name} desconectado da sala {room_id} durante o encerramento. Estado preservado.")
+            return
         logger.info(f"Jogador {user_name} desconectado da sala {room_id}.")
         room_state = self.rooms_data.get(room_id)
         if not room_state:
@@ -309,7 +484,7 @@ class GameManager:
                     # e os dados do GameManager podem ser limpos aqui ou por um job.
                     elif not conn_manager.get_users_in_room(room_id) and room_id in self.rooms_data:
                         logger.info(f"Host saiu, sala {room_id} vazia e esperando. Removendo dados do jogo.")
-                        del self.rooms_data[room_id]
+                        await self._drop_room(room_id)
                         return # Sai cedo pois a sala não existe mais para broadcast
 
         # Remove o jogador da lista de jogadores ativos para fins de lógica de jogo
@@ -348,14 +523,22 @@ class GameManager:
         # Garante que a lista de jogadores no room_state reflita quem está conectado
         connected_player_names = conn_manager.get_users_in_room(room_id)
         current_players_in_state = list(room_state.players.keys())
+        pending_reconnect = self.awaiting_reconnect.get(room_id, ())
         
         # Remove jogadores do estado se não estiverem mais conectados
+        # (exceto os de salas recuperadas que ainda podem reconectar, ou durante o encerramento)
         for p_name_in_state in current_players_in_state:
-            if p_name_in_state not in connected_player_names:
+            if self.shutting_down:
+                break
+            if p_name_in_state not in connected_player_names and p_name_in_state not in pending_reconnect:
                 logger.debug(f"Removendo jogador {p_name_in_state} do estado da sala {room_id} pois não está mais conectado.")
                 room_state.players.pop(p_name_in_state, None)
                 if p_name_in_state in room_state.player_order:
                     room_state.player_order.remove(p_name_in_state)
+                room_journal.record("leave", room_id, {"user": p_name_in_state, "host": room_state.host_name})
+                # Antes do início o jogador ainda não pontuou: sai também do ranking do torneio
+                if room_state.tournament_id and room_state.game_status == "waiting":
+                    tournament_manager.remove_player(room_state.tournament_id, room_id, p_name_in_state)
 
 
         # Prepara o payload para enviar aos clientes (sem respostas corretas)
@@ -373,11 +556,78 @@ class GameManager:
             return
         
         scores_dict = {name: p.score for name, p in room_state.players.items()}
-        await conn_manager.broadcast_to_room(room_id, {
+        score_message = {
             "type": "score_update",
             "scores": scores_dict
-        })
-
+        }
+        await conn_manager.broadcast_to_room(room_id, score_message)
+        spectator_broadcaster.publish(room_id, "score", score_message)
+
+    # --- Journal / recuperação ---
+
+    @staticmethod
+    def _room_to_snapshot(room_state: GameRoomStateSchema) -> Dict[str, Any]:
+        return {
+            "state": room_state.model_dump(exclude={'original_questions_with_answers'}),
+            "answers": room_state.original_questions_with_answers,
+        }
+
+    def restore_rooms(self, rooms: Dict[str, Any], reconnect_timeout_s: int) -> int:
+        """
+        Reconstrói `rooms_data` a partir do estado recuperado do journal
+        (ver `room_journal.recover`) e agenda o prazo de reconexão dos jogadores.
+        Retorna o número de salas recuperadas.
+        """
+        for room_id, snap in rooms.items():
+            room_state = GameRoomStateSchema.model_validate(snap["state"])
+            room_state.original_questions_with_answers = snap["answers"]
+            self.rooms_data[room_id] = room_state
+            # Salas sem jogadores também aguardam o prazo, para então serem descartadas
+            self.awaiting_reconnect[room_id] = set(room_state.players)
+        if self.awaiting_reconnect:
+            self._reconnect_deadline_task = asyncio.create_task(self._expire_restored_rooms(reconnect_timeout_s))
+        return len(rooms)
+
+    async def _expire_restored_rooms(self, timeout_s: int):
+        """
+        Encerrado o prazo de reconexão, salas recuperadas sem ninguém conectado são
+        finalizadas (jogo ativo, pontuações persistidas) ou descartadas (aguardando);
+        nas demais, quem não voltou sai da sala pelo caminho normal.
+        """
+        await asyncio.sleep(timeout_s)
+        if self.shutting_down:
+            return
+        for room_id in list(self.awaiting_reconnect):
+            self.awaiting_reconnect.pop(room_id, None)
+            room_state = self.rooms_data.get(room_id)
+            if not room_state:
+                continue
+            connected = conn_manager.get_users_in_room(room_id)
+            try:
+                if not connected:
+                    if room_state.game_status == "active":
+                        logger.info(f"Ninguém reconectou à sala recuperada {room_id}. Finalizando jogo.")
+                        await self._finalize_game_for_all(room_id)
+                        self.rooms_data.pop(room_id, None)
+                    else:
+                        logger.info(f"Ninguém reconectou à sala recuperada {room_id}. Removendo.")
+                        await self._drop_room(room_id)
+                    continue
+
+                if room_state.host_name not in connected:
+                    room_state.host_name = next((name for name in room_state.player_order if name in connected), connected[0])
+                    logger.info(f"Novo host para sala recuperada {room_id}: {room_state.host_name}.")
+                # Remove (e registra no journal) os jogadores que não reconectaram
+                await self._broadcast_room_update(room_id)
+
+                current_q_idx = room_state.current_question_index
+                if room_state.game_status == "active" and current_q_idx >= 0 and all(
+                    p.finished_game or p.answers[current_q_idx] is not None
+                    for name, p in room_state.players.items() if name in connected
+                ):
+                    await self._check_next_question_or_end_game(room_id)
+            except Exception as e:
+                logger.error(f"Erro ao expirar sala recuperada {room_id}: {e}", exc_info=True)
 
 # Instância única do GameManager
 game_manager = GameManager()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from fastapi import WebSocket
+from app.core.config import settings
+from app.services.connection_manager import manager as conn_manager
+from app.services.game_manager import game_manager
+from app.services.tournament_manager import tournament_manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+PING_FRAME = json.dumps({"type": "ping"})
+
+
+class HeartbeatMonitor:
+    """
+    Detecta conexões mortas com ping/pong na camada de aplicação.
+
+    Um único agendador percorre as conexões em lotes: elas são distribuídas em
+    `interval / tick` baldes e cada tick processa apenas um balde, então cada
+    conexão recebe um ping por intervalo e o custo de cada tick é constante por
+    conexão, sem uma tarefa por socket. Qualquer mensagem recebida do cliente
+    conta como sinal de vida. Conexões sem resposta dentro do timeout são
+    removidas pelo mesmo caminho de `process_disconnect` usado pelo endpoint.
+    """
+
+    def __init__(self, interval_s: int = 15, timeout_s: int = 45, tick_ms: int = 500, send_timeout_s: float = 2.0):
+        self.timeout = timeout_s
+        self.tick_interval = tick_ms / 1000
+        self.send_timeout = send_timeout_s
+        self._buckets: List[Set[WebSocket]] = [set() for _ in range(max(1, int(interval_s * 1000 / tick_ms)))]
+        self._cursor = 0
+        self._next_bucket = 0
+        self._last_seen: Dict[WebSocket, float] = {}
+        # websocket -> (índice do balde, room_id, user_name, é espectador)
+        self._connections: Dict[WebSocket, Tuple[int, str, str, bool]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, websocket: WebSocket, room_id: str, user_name: str, is_spectator: bool = False):
+        """Passa a monitorar uma conexão já associada a uma sala."""
+        if websocket in self._connections:
+            return
+        bucket = self._next_bucket
+        self._next_bucket = (self._next_bucket + 1) % len(self._buckets)
+        self._buckets[bucket].add(websocket)
+        self._connections[websocket] = (bucket, room_id, user_name, is_spectator)
+        self._last_seen[websocket] = time.monotonic()
+
+    def unregister(self, websocket: WebSocket):
+        entry = self._connections.pop(websocket, None)
+        if entry is None:
+            return
+        self._buckets[entry[0]].discard(websocket)
+        self._last_seen.pop(websocket, None)
+
+    def touch(self, websocket: WebSocket):
+        """Marca a conexão como viva (chamado a cada mensagem recebida)."""
+        if websocket in self._last_seen:
+            self._last_seen[websocket] = time.monotonic()
+
+    def start(self):
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            bucket = self._buckets[self._cursor]
+            self._cursor = (self._cursor + 1) % len(self._buckets)
+            if not bucket:
+                continue
+            try:
+                await self._sweep(list(bucket))
+            except Exception as e:
+                logger.error(f"Erro na varredura de heartbeat: {e}", exc_info=True)
+
+    async def _sweep(self, connections: List[WebSocket]):
+        now = time.monotonic()
+        dead, alive = [], []
+        for ws in connections:
+            (dead if now - self._last_seen.get(ws, now) > self.timeout else alive).append(ws)
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(ws.send_text(PING_FRAME), self.send_timeout) for ws in alive),
+            return_exceptions=True,
+        )
+        dead.extend(ws for ws, result in zip(alive, results) if isinstance(result, Exception))
+
+        if dead:
+            logger.info(f"Heartbeat: {len(dead)} conexões sem resposta serão desconectadas.")
+            # Estado das salas atualizado em sequência; os fechamentos de socket em paralelo
+            for ws in dead:
+                await self._expire(ws)
+            await asyncio.gather(
+                *(asyncio.wait_for(ws.close(code=1001), self.send_timeout) for ws in dead),
+                return_exceptions=True,
+            )
+
+    async def _expire(self, websocket: WebSocket):
+        entry = self._connections.get(websocket)
+        if entry is None:
+            return
+        _, room_id, user_name, is_spectator = entry
+        self.unregister(websocket)
+        tournament_manager.unsubscribe(websocket)
+        if is_spectator:
+            conn_manager.remove_spectator(websocket, room_id)
+        elif websocket in conn_manager.websocket_users:
+            logger.info(f"Heartbeat: '{user_name}' não respondeu na sala {room_id}. Desconectando.")
+            conn_manager.disconnect(websocket, room_id)
+            await game_manager.process_disconnect(room_id, user_name, websocket)
+
+
+# Instância única do monitor de heartbeat
+heartbeat_monitor = HeartbeatMonitor(
+    interval_s=settings.HEARTBEAT_INTERVAL_S,
+    timeout_s=settings.HEARTBEAT_TIMEOUT_S,
+    tick_ms=settings.HEARTBEAT_TICK_MS,
+)
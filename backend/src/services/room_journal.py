@@ -0,0 +1,278 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Optional, Any, Tuple
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE_NAME = "rooms_snapshot.json"
+SEGMENT_PREFIX = "journal-"
+SEGMENT_SUFFIX = ".log"
+
+
+def apply_room_events(rooms: Dict[str, Any], events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aplica eventos do journal (em ordem) sobre o estado serializado das salas
+    ({room_id: {"state": ..., "answers": ...}}). Salas finalizadas ou removidas
+    são descartadas. Usado tanto na compactação quanto na recuperação.
+    """
+    for entry in events:
+        room_id, event, data = entry["room_id"], entry["event"], entry["data"]
+        if event == "create":
+            rooms[room_id] = data
+            continue
+        snap = rooms.get(room_id)
+        if snap is None:
+            continue
+        state = snap["state"]
+        if event == "join":
+            # Mesmo formato de PlayerSchema.model_dump()
+            state["players"][data["user"]] = {
+                "name": data["user"], "score": 0, "answers": [None] * len(state["questions"]), "finished_game": False
+            }
+            if data["user"] not in state["player_order"]:
+                state["player_order"].append(data["user"])
+        elif event == "start":
+            state["game_status"] = "active"
+            state["current_question_index"] = 0
+        elif event == "answer":
+            player = state["players"].get(data["user"])
+            if player:
+                player["answers"][data["q"]] = data["answer"]
+                player["score"] = data["score"]
+                player["finished_game"] = data["finished"]
+        elif event == "advance":
+            state["current_question_index"] = data["q"]
+        elif event == "leave":
+            state["players"].pop(data["user"], None)
+            if data["user"] in state["player_order"]:
+                state["player_order"].remove(data["user"])
+            state["host_name"] = data["host"]
+        elif event in ("finalize", "drop"):
+            del rooms[room_id]
+    return rooms
+
+
+class RoomJournal:
+    """
+    Journal append-only dos eventos das salas, usado para recuperar os jogos em
+    andamento após um deploy ou crash.
+
+    O caminho de escrita (`record`) apenas acrescenta uma tupla a um buffer em
+    memória; serialização, escrita e fsync acontecem em lote numa única tarefa
+    de fundo. Snapshots periódicos de todas as salas limitam o tamanho dos
+    segmentos de journal que precisam ser reaplicados na inicialização. O
+    snapshot é compactado na thread de escrita, a partir do snapshot anterior e
+    dos segmentos já gravados, sem percorrer as salas no event loop.
+    """
+
+    def __init__(self, directory: str, fsync_interval_ms: int = 50, snapshot_interval_s: int = 60):
+        self.directory = directory
+        self.fsync_interval = fsync_interval_ms / 1000
+        self.snapshot_interval = snapshot_interval_s
+        self.enabled = bool(directory)
+
+        self._seq = 0
+        self._buffer: List[Tuple[int, str, str, Any]] = []
+        self._segment_path: Optional[str] = None
+        self._last_snapshot = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+
+    def record(self, event: str, room_id: str, data: Any = None):
+        """
+        Registra um evento de sala. Não faz I/O: os dados devem ser valores
+        primitivos (ou estruturas já copiadas), pois são serializados depois.
+        """
+        if not self.enabled:
+            return
+        self._seq += 1
+        self._buffer.append((self._seq, event, room_id, data))
+
+    # --- Ciclo de vida ---
+
+    def start(self):
+        """Inicia a tarefa de fundo que faz flush/fsync em lote e snapshots periódicos."""
+        if not self.enabled or self._task:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._segment_path = self._new_segment_path(self._seq + 1)
+        self._last_snapshot = time.monotonic()
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Journal de salas ativo em '{self.directory}'.")
+
+    async def stop(self):
+        """
+        Encerra a tarefa de fundo e grava um snapshot final. A tarefa não é
+        cancelada: ela termina a escrita em andamento antes de sair, para que
+        nunca haja duas threads de escrita ao mesmo tempo.
+        """
+        if not self._task:
+            return
+        self._stop_event.set()
+        await self._task
+        self._task = None
+        await self._snapshot()
+        logger.info("Journal de salas encerrado.")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self.fsync_interval)
+                return # `stop` grava o restante do buffer no snapshot final
+            except asyncio.TimeoutError:
+                pass
+            try:
+                if time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+                    await self._snapshot()
+                else:
+                    await self._flush()
+            except Exception as e:
+                logger.error(f"Erro no journal de salas: {e}", exc_info=True)
+
+    # --- Escrita ---
+
+    def _new_segment_path(self, first_seq: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{first_seq:020d}{SEGMENT_SUFFIX}")
+
+    def _take_buffer(self) -> List[Tuple[int, str, str, Any]]:
+        pending, self._buffer = self._buffer, []
+        return pending
+
+    def _restore_buffer(self, pending: List[Tuple[int, str, str, Any]]):
+        """Devolve ao início do buffer eventos cuja escrita falhou, para a próxima tentativa."""
+        self._buffer[:0] = pending
+
+    @staticmethod
+    def _encode(pending: List[Tuple[int, str, str, Any]]) -> bytes:
+        lines = [
+            json.dumps({"seq": seq, "event": event, "room_id": room_id, "data": data}, separators=(",", ":"))
+            for seq, event, room_id, data in pending
+        ]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _append_and_fsync(path: str, payload: bytes):
+        with open(path, "ab") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _flush(self):
+        pending = self._take_buffer()
+        if not pending:
+            return
+        try:
+            await asyncio.to_thread(self._append_and_fsync, self._segment_path, self._encode(pending))
+        except Exception:
+            self._restore_buffer(pending)
+            raise
+
+    async def _snapshot(self):
+        """
+        Troca de segmento e compacta, na thread de escrita, o snapshot anterior
+        com os eventos até `seq`. No event loop só acontece a troca do buffer e
+        do segmento; os segmentos anteriores são apagados depois que o novo
+        snapshot estiver persistido.
+        """
+        if not self._segment_path:
+            return
+        pending = self._take_buffer()
+        old_segment = self._segment_path
+        snapshot_seq = self._seq
+        self._segment_path = self._new_segment_path(self._seq + 1)
+        self._last_snapshot = time.monotonic()
+
+        appended = False
+
+        def write() -> int:
+            nonlocal appended
+            if pending:
+                self._append_and_fsync(old_segment, self._encode(pending))
+            appended = True
+            rooms, events, _ = self._read_state(upto_seq=snapshot_seq)
+            rooms = apply_room_events(rooms, events)
+            path = os.path.join(self.directory, SNAPSHOT_FILE_NAME)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"seq": snapshot_seq, "rooms": rooms}, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            for segment in self._list_segments():
+                if segment != self._segment_path:
+                    os.remove(segment)
+            return len(rooms)
+
+        try:
+            room_count = await asyncio.to_thread(write)
+        except Exception:
+            # Sem o snapshot, os segmentos anteriores continuam valendo; eventos ainda
+            # não gravados voltam ao buffer e vão para o segmento novo (o replay ordena por seq)
+            if not appended:
+                self._restore_buffer(pending)
+            raise
+        logger.info(f"Snapshot do journal gravado: {room_count} salas (seq {snapshot_seq}).")
+
+    # --- Recuperação ---
+
+    def _list_segments(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith(SEGMENT_PREFIX) and n.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def _read_state(self, upto_seq: Optional[int] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]], int]:
+        """
+        Lê o último snapshot e os eventos posteriores a ele (até `upto_seq`, se informado), em ordem.
+        Retorna (salas do snapshot, eventos, seq do snapshot).
+        """
+        rooms: Dict[str, Any] = {}
+        snapshot_seq = 0
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE_NAME)
+        if os.path.exists(snapshot_path):
+            try:
+                with open(snapshot_path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                rooms = snapshot.get("rooms", {})
+                snapshot_seq = snapshot.get("seq", 0)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error(f"Snapshot do journal ilegível ({e}). Recuperando apenas pelos segmentos.")
+
+        events: List[Dict[str, Any]] = []
+        for segment in self._list_segments():
+            with open(segment, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última linha truncada por um crash no meio da escrita
+                        logger.warning(f"Linha inválida ignorada no segmento {segment}.")
+                        continue
+                    if entry["seq"] > snapshot_seq and (upto_seq is None or entry["seq"] <= upto_seq):
+                        events.append(entry)
+
+        events.sort(key=lambda e: e["seq"])
+        return rooms, events, snapshot_seq
+
+    def recover(self) -> Tuple[Dict[str, Any], int]:
+        """
+        Reconstrói o estado serializado das salas (snapshot + eventos posteriores).
+        Retorna (salas, número de eventos reaplicados). Deve ser chamado antes de `start`.
+        """
+        if not self.enabled:
+            return {}, 0
+        rooms, events, snapshot_seq = self._read_state()
+        self._seq = max(snapshot_seq, events[-1]["seq"] if events else 0)
+        return apply_room_events(rooms, events), len(events)
+
+# Instância única do journal (desativado se JOURNAL_DIR não estiver definido)
+room_journal = RoomJournal(
+    settings.JOURNAL_DIR,
+    fsync_interval_ms=settings.JOURNAL_FSYNC_INTERVAL_MS,
+    snapshot_interval_s=settings.JOURNAL_SNAPSHOT_INTERVAL_S,
+)
@@ -0,0 +1,89 @@
+import asyncio
+import json
+from typing import Dict, Optional
+from fastapi import WebSocket
+from app.core.config import settings
+from app.services.connection_manager import manager as conn_manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ordem em que os eventos acumulados aparecem em um frame
+SPECTATOR_EVENT_KINDS = ("question", "score", "final")
+
+
+class SpectatorBroadcaster:
+    """
+    Envia aos espectadores um fluxo limitado de eventos (pergunta, placar e
+    resultado final) de cada sala.
+
+    `publish` só guarda o último evento de cada tipo por sala, então o caminho
+    dos jogadores nunca espera pelos espectadores. A cada tick, o frame de cada
+    sala é codificado uma única vez e o mesmo texto é enviado a todos os seus
+    espectadores.
+    """
+
+    def __init__(self, tick_ms: int = 250, send_timeout_s: float = 2.0):
+        self.tick_interval = tick_ms / 1000
+        self.send_timeout = send_timeout_s
+        # room_id -> tipo do evento -> última mensagem publicada
+        self._pending: Dict[str, Dict[str, dict]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def publish(self, room_id: str, kind: str, message: dict):
+        """Agenda um evento para os espectadores da sala (sem I/O)."""
+        if room_id not in conn_manager.spectators:
+            return
+        self._pending.setdefault(room_id, {})[kind] = message
+
+    def start(self):
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            if not self._pending:
+                continue
+            pending, self._pending = self._pending, {}
+            try:
+                await asyncio.gather(*(self._send_frame(room_id, events) for room_id, events in pending.items()))
+            except Exception as e:
+                logger.error(f"Erro ao transmitir frames para espectadores: {e}", exc_info=True)
+
+    async def _send_frame(self, room_id: str, events: Dict[str, dict]):
+        spectators = list(conn_manager.get_spectators_in_room(room_id))
+        if not spectators:
+            return
+        frame = json.dumps({
+            "type": "spectator_frame",
+            "room_id": room_id,
+            "events": [events[kind] for kind in SPECTATOR_EVENT_KINDS if kind in events],
+        })
+        results = await asyncio.gather(
+            *(asyncio.wait_for(ws.send_text(frame), self.send_timeout) for ws in spectators),
+            return_exceptions=True,
+        )
+        for ws, result in zip(spectators, results):
+            if isinstance(result, Exception):
+                # Espectador lento ou desconectado: deixa de receber frames
+                logger.warning(f"Erro ao enviar frame para espectador ({ws.client}) na sala {room_id}: {result}. Removendo.")
+                conn_manager.remove_spectator(ws, room_id)
+
+
+# Instância única do broadcaster de espectadores
+spectator_broadcaster = SpectatorBroadcaster(
+    tick_ms=settings.SPECTATOR_TICK_MS,
+    send_timeout_s=settings.SPECTATOR_SEND_TIMEOUT_S,
+)
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import shortuuid
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Any, Set, Tuple
+from fastapi import WebSocket
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+PlayerKey = Tuple[str, str] # (room_id, user_name)
+
+
+class Leaderboard:
+    """
+    Ranking combinado de várias salas, mantido ordenado e atualizado de forma
+    incremental a partir dos deltas de pontuação (sem recalcular o ranking).
+    """
+
+    def __init__(self):
+        self._scores: Dict[PlayerKey, int] = {}
+        # Entradas (-score, room_id, user_name) em ordem crescente = maior pontuação primeiro
+        self._ranking: List[Tuple[int, str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+    def add_player(self, room_id: str, user_name: str):
+        key = (room_id, user_name)
+        if key in self._scores:
+            return
+        self._scores[key] = 0
+        insort(self._ranking, (0, room_id, user_name))
+
+    def apply_delta(self, room_id: str, user_name: str, delta: int):
+        key = (room_id, user_name)
+        old_score = self._scores.get(key)
+        if old_score is None:
+            return
+        position = bisect_left(self._ranking, (-old_score, room_id, user_name))
+        del self._ranking[position]
+        self._scores[key] = old_score + delta
+        insort(self._ranking, (-(old_score + delta), room_id, user_name))
+
+    def remove_player(self, room_id: str, user_name: str):
+        score = self._scores.pop((room_id, user_name), None)
+        if score is None:
+            return
+        position = bisect_left(self._ranking, (-score, room_id, user_name))
+        del self._ranking[position]
+
+    def remove_room(self, room_id: str):
+        """Remove todos os jogadores de uma sala (O(n), usado só quando a sala é descartada)."""
+        for key in [key for key in self._scores if key[0] == room_id]:
+            self.remove_player(*key)
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        return [
+            {"rank": i + 1, "room_id": room_id, "player_name": user_name, "score": -neg_score}
+            for i, (neg_score, room_id, user_name) in enumerate(self._ranking[:n])
+        ]
+
+    def rank_of(self, room_id: str, user_name: str) -> Tuple[Optional[int], Optional[int]]:
+        """Retorna (posição, pontuação) do jogador, ou (None, None) se não estiver no ranking."""
+        score = self._scores.get((room_id, user_name))
+        if score is None:
+            return None, None
+        return bisect_left(self._ranking, (-score, room_id, user_name)) + 1, score
+
+
+class Tournament:
+    def __init__(self, tournament_id: str, name: str, questions: List[Dict[str, Any]], expires_at: float):
+        self.tournament_id = tournament_id
+        self.name = name
+        self.questions = questions # Mesma seleção de perguntas (com respostas) para todas as salas
+        self.room_ids: Set[str] = set()
+        self.leaderboard = Leaderboard()
+        self.dirty = False # Há mudanças ainda não enviadas aos inscritos
+        self.expires_at = expires_at # time.monotonic() a partir do qual o torneio é encerrado
+        # websocket -> (top_n, chave do jogador ou None para espectadores)
+        self.subscribers: Dict[WebSocket, Tuple[int, Optional[PlayerKey]]] = {}
+
+
+class TournamentManager:
+    """
+    Agrupa salas em torneios e envia o ranking combinado aos inscritos.
+
+    As pontuações só marcam o torneio como alterado; um único agendador envia,
+    no máximo uma vez por intervalo, o top N (codificado uma vez para cada N
+    distinto) junto com a posição de cada inscrito. O mesmo agendador encerra
+    os torneios que passaram da duração máxima.
+    """
+
+    def __init__(self, push_interval_ms: int = 1000, max_top_n: int = 50, max_duration_s: int = 21600, send_timeout_s: float = 2.0):
+        self.push_interval = push_interval_ms / 1000
+        self.max_duration = max_duration_s
+        self.max_top_n = max_top_n
+        self.send_timeout = send_timeout_s
+        self.tournaments: Dict[str, Tournament] = {}
+        self._subscriptions: Dict[WebSocket, str] = {} # websocket -> tournament_id
+        self._task: Optional[asyncio.Task] = None
+
+    def create_tournament(self, name: str, questions: List[Dict[str, Any]]) -> Tournament:
+        tournament_id = shortuuid.uuid()[:8].upper()
+        while tournament_id in self.tournaments:
+            tournament_id = shortuuid.uuid()[:8].upper()
+        tournament = Tournament(tournament_id, name, questions, time.monotonic() + self.max_duration)
+        self.tournaments[tournament_id] = tournament
+        logger.info(f"Torneio {tournament_id} ('{name}') criado com {len(questions)} perguntas.")
+        return tournament
+
+    def get_tournament(self, tournament_id: str) -> Optional[Tournament]:
+        return self.tournaments.get(tournament_id)
+
+    def attach_room(self, tournament_id: str, room_id: str):
+        tournament = self.tournaments.get(tournament_id)
+        if tournament:
+            tournament.room_ids.add(room_id)
+
+    def add_player(self, tournament_id: str, room_id: str, user_name: str):
+        tournament = self.tournaments.get(tournament_id)
+        if tournament:
+            tournament.leaderboard.add_player(room_id, user_name)
+            tournament.dirty = True
+
+    def remove_player(self, tournament_id: str, room_id: str, user_name: str):
+        tournament = self.tournaments.get(tournament_id)
+        if tournament:
+            tournament.leaderboard.remove_player(room_id, user_name)
+            tournament.dirty = True
+
+    def detach_room(self, tournament_id: str, room_id: str):
+        """Tira do torneio uma sala descartada, junto com os seus jogadores."""
+        tournament = self.tournaments.get(tournament_id)
+        if tournament:
+            tournament.room_ids.discard(room_id)
+            tournament.leaderboard.remove_room(room_id)
+            tournament.dirty = True
+
+    async def end_tournament(self, tournament_id: str) -> Optional[Tournament]:
+        """Encerra o torneio: envia o ranking final aos inscritos e o remove da memória."""
+        tournament = self.tournaments.pop(tournament_id, None)
+        if not tournament:
+            return None
+        subscribers = list(tournament.subscribers)
+        for websocket in subscribers:
+            self._subscriptions.pop(websocket, None)
+        tournament.subscribers.clear()
+        frame = json.dumps({
+            "type": "tournament_ended",
+            "tournament_id": tournament_id,
+            "top": tournament.leaderboard.top(self.max_top_n),
+        })
+        await asyncio.gather(
+            *(asyncio.wait_for(ws.send_text(frame), self.send_timeout) for ws in subscribers),
+            return_exceptions=True,
+        )
+        logger.info(f"Torneio {tournament_id} encerrado.")
+        return tournament
+
+    def record_score(self, tournament_id: str, room_id: str, user_name: str, delta: int):
+        """Aplica um delta de pontuação ao ranking do torneio (O(log n) + deslocamento da lista)."""
+        tournament = self.tournaments.get(tournament_id)
+        if tournament:
+            tournament.leaderboard.apply_delta(room_id, user_name, delta)
+            tournament.dirty = True
+
+    # --- Inscrições ---
+
+    async def subscribe(self, websocket: WebSocket, tournament_id: str, top_n: int, player_key: Optional[PlayerKey]) -> bool:
+        tournament = self.tournaments.get(tournament_id)
+        if not tournament:
+            return False
+        self.unsubscribe(websocket)
+        top_n = max(1, min(top_n, self.max_top_n))
+        tournament.subscribers[websocket] = (top_n, player_key)
+        self._subscriptions[websocket] = tournament_id
+        # Envia o estado atual ao novo inscrito sem esperar o próximo tick
+        frame = self._encode_frame(tournament, top_n, player_key, json.dumps(tournament.leaderboard.top(top_n)))
+        try:
+            await asyncio.wait_for(websocket.send_text(frame), self.send_timeout)
+        except Exception as e:
+            logger.warning(f"Erro ao enviar ranking inicial do torneio {tournament_id}: {e}")
+        return True
+
+    def unsubscribe(self, websocket: WebSocket):
+        tournament_id = self._subscriptions.pop(websocket, None)
+        if tournament_id and tournament_id in self.tournaments:
+            self.tournaments[tournament_id].subscribers.pop(websocket, None)
+
+    # --- Envio com taxa limitada ---
+
+    def start(self):
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.push_interval)
+            try:
+                now = time.monotonic()
+                for tournament_id in [t.tournament_id for t in self.tournaments.values() if t.expires_at <= now]:
+                    await self.end_tournament(tournament_id)
+                await asyncio.gather(*(
+                    self._push(tournament) for tournament in list(self.tournaments.values()) if tournament.dirty
+                ))
+            except Exception as e:
+                logger.error(f"Erro ao enviar rankings de torneio: {e}", exc_info=True)
+
+    @staticmethod
+    def _encode_frame(tournament: Tournament, top_n: int, player_key: Optional[PlayerKey], top_json: str) -> str:
+        rank, score = tournament.leaderboard.rank_of(*player_key) if player_key else (None, None)
+        # O top N já vem codificado e é compartilhado entre os inscritos
+        return (
+            f'{{"type":"leaderboard_update","tournament_id":{json.dumps(tournament.tournament_id)},'
+            f'"total_players":{len(tournament.leaderboard)},"top":{top_json},'
+            f'"your_rank":{json.dumps(rank)},"your_score":{json.dumps(score)}}}'
+        )
+
+    async def _push(self, tournament: Tournament):
+        tournament.dirty = False
+        if not tournament.subscribers:
+            return
+        subscribers = list(tournament.subscribers.items())
+        top_cache: Dict[int, str] = {}
+        frames = []
+        for websocket, (top_n, player_key) in subscribers:
+            if top_n not in top_cache:
+                top_cache[top_n] = json.dumps(tournament.leaderboard.top(top_n))
+            frames.append(self._encode_frame(tournament, top_n, player_key, top_cache[top_n]))
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(ws.send_text(frame), self.send_timeout) for (ws, _), frame in zip(subscribers, frames)),
+            return_exceptions=True,
+        )
+        for (ws, _), result in zip(subscribers, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Erro ao enviar ranking do torneio {tournament.tournament_id}: {result}. Removendo inscrição.")
+                self.unsubscribe(ws)
+
+
+# Instância única do TournamentManager
+tournament_manager = TournamentManager(
+    push_interval_ms=settings.LEADERBOARD_PUSH_INTERVAL_MS,
+    max_top_n=settings.LEADERBOARD_MAX_TOP_N,
+    max_duration_s=settings.TOURNAMENT_MAX_DURATION_S,
+)
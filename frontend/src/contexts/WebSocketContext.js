@@ -159,6 +159,11 @@ export const WebSocketProvider = ({ children }) => {
 
     socket.onmessage = (event) => {
       const message = JSON.parse(event.data);
+      if (message.type === 'ping') {
+        // Heartbeat do servidor: responde imediatamente para não ser desconectado
+        socket.send(JSON.stringify({ type: 'pong' }));
+        return;
+      }
       console.log('WebSocket Mensagem Recebida:', message);
       dispatch({ type: actionTypes.RECEIVE_MESSAGE, payload: { message } });
 